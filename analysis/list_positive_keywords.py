@@ -5,6 +5,7 @@
 #   python list_positive_keywords.py --customer-id 6091332809 --ad-group-id 187136680689 --to-csv positives.csv
 
 import argparse, csv
+from collections import Counter
 from google.ads.googleads.client import GoogleAdsClient
 
 def ga(client): return client.get_service("GoogleAdsService")
@@ -34,7 +35,6 @@ def main():
     """
     rows = qrows(client, args.customer_id, q)
 
-    by_match, by_status = {}, {}
     items = []
     for r in rows:
         kw = r.ad_group_criterion.keyword
@@ -48,8 +48,8 @@ def main():
             "status": status,
             "cpc_bid": (bid/1_000_000.0) if bid else None,
         })
-        by_match[mt] = by_match.get(mt, 0) + 1
-        by_status[status] = by_status.get(status, 0) + 1
+    by_match = Counter(it["match_type"] for it in items)
+    by_status = Counter(it["status"] for it in items)
 
     print(f"Positive keywords in ad group {args.ad_group_id}: {len(items)}\n")
     if by_match:
@@ -27,14 +27,20 @@ from __future__ import annotations
 
 import argparse
 import csv
+import functools
+import hashlib
 import os
+import sqlite3
+import threading
 import sys
 import time
-from typing import Iterable, List, Dict, Any, Tuple, Optional
-from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Dict, Any, Tuple, Optional
+from urllib.parse import urlparse, parse_qs, unquote_plus
 import re
 
 import requests
+from requests.adapters import HTTPAdapter
 import tldextract
 from google.ads.googleads.client import GoogleAdsClient
 from google.ads.googleads.errors import GoogleAdsException
@@ -65,6 +71,9 @@ WHERE
   AND campaign.status = 'ENABLED'
 """
 
+# Kept separate from GAQL_ADS: ad_group_ad_asset_view only returns ads that have
+# text assets, so a merged query would drop non-RSA ads from ads.csv. The two
+# streams are fetched concurrently in main() instead.
 GAQL_RSA_ASSETS = """
 SELECT
   campaign.id,
@@ -148,35 +157,144 @@ WHERE ad_group_asset.field_type = 'SITELINK'
 """
 
 
+# ---------- CACHE ----------
+
+GAQL_CACHE_TTL = 24 * 3600  # seconds
+HTTP_CACHE_TTL = 3600  # seconds
+
+
+class DiskCache:
+    """
+    SQLite-backed cache shared across runs: GAQL result rows keyed by
+    sha256(customer_id, api_version, query) and HTTP probe results keyed by (url, timeout).
+    """
+
+    def __init__(self, cache_dir: str, refresh: bool = False):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.refresh = refresh  # ignore existing entries but still write fresh ones
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, "ads_audit_cache.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS gaql (key TEXT PRIMARY KEY, created REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS gaql_rows (key TEXT NOT NULL, seq INTEGER NOT NULL, row BLOB NOT NULL,
+                                                  PRIMARY KEY (key, seq));
+            CREATE TABLE IF NOT EXISTS http (url TEXT NOT NULL, timeout INTEGER NOT NULL, status INTEGER,
+                                             note TEXT, created REAL NOT NULL, PRIMARY KEY (url, timeout));
+        """)
+        self._db.commit()
+
+    @staticmethod
+    def gaql_key(customer_id: str, query: str, api_version: str) -> str:
+        return hashlib.sha256(f"{customer_id}\0{api_version}\0{query}".encode("utf-8")).hexdigest()
+
+    def get_rows(self, key: str) -> Optional[List[bytes]]:
+        if self.refresh:
+            return None
+        with self._lock:
+            hit = self._db.execute(
+                "SELECT 1 FROM gaql WHERE key = ? AND created >= ?", (key, time.time() - GAQL_CACHE_TTL)
+            ).fetchone()
+            if not hit:
+                return None
+            return [r[0] for r in self._db.execute("SELECT row FROM gaql_rows WHERE key = ? ORDER BY seq", (key,))]
+
+    def put_rows(self, key: str, rows: List[bytes]) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM gaql_rows WHERE key = ?", (key,))
+            self._db.executemany("INSERT INTO gaql_rows (key, seq, row) VALUES (?, ?, ?)",
+                                 ((key, i, r) for i, r in enumerate(rows)))
+            self._db.execute("INSERT OR REPLACE INTO gaql (key, created) VALUES (?, ?)", (key, time.time()))
+
+    def get_probe(self, url: str, timeout: int) -> Optional[Tuple[Optional[int], Optional[str]]]:
+        if self.refresh:
+            return None
+        with self._lock:
+            hit = self._db.execute(
+                "SELECT status, note FROM http WHERE url = ? AND timeout = ? AND created >= ?",
+                (url, timeout, time.time() - HTTP_CACHE_TTL),
+            ).fetchone()
+        return (hit[0], hit[1]) if hit else None
+
+    def put_probe(self, url: str, timeout: int, result: Tuple[Optional[int], Optional[str]]) -> None:
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO http (url, timeout, status, note, created) VALUES (?, ?, ?, ?, ?)",
+                             (url, timeout, result[0], result[1], time.time()))
+
+
+# Set by main() when --cache-dir is given
+_CACHE: Optional[DiskCache] = None
+
+
+def _row_codec(row_cls):
+    """(serialize, deserialize) for GoogleAdsRow with or without use_proto_plus."""
+    if hasattr(row_cls, "deserialize"):
+        return row_cls.serialize, row_cls.deserialize
+    return (lambda m: m.SerializeToString()), row_cls.FromString
+
+
 # ---------- UTIL ----------
 
+# Single extractor using the bundled public suffix snapshot (no network refresh per run)
+_TLD_EXTRACT = tldextract.TLDExtract(suffix_list_urls=())
+
 def ensure_out_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def write_csv(path: str, rows: Iterable[Dict[str, Any]], fieldnames: List[str]) -> None:
+def _coerce(v: Any) -> Any:
+    # stringify lists/dicts for CSV
+    return str(v) if isinstance(v, (list, dict)) else v
+
+
+def write_csv(path: str, rows: Iterable[Dict[str, Any]], fieldnames: List[str]) -> int:
+    """Write rows as they arrive (generators are consumed lazily); returns the row count."""
+    cols = tuple(fieldnames)
+    n = 0
     with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
-        w.writeheader()
+        w = csv.writer(f)
+        w.writerow(cols)
         for r in rows:
-            # stringify lists/dicts for CSV
-            out = {}
-            for k, v in r.items():
-                if isinstance(v, (list, dict)):
-                    out[k] = str(v)
-                else:
-                    out[k] = v
-            w.writerow(out)
+            # Missing keys become "" like DictWriter's default restval
+            w.writerow(tuple(_coerce(r.get(k, "")) for k in cols))
+            n += 1
+    return n
 
 
+def write_csv_tuples(path: str, rows: Iterable[Tuple[Any, ...]], fieldnames: List[str]) -> int:
+    """Like write_csv for rows already shaped as scalar tuples in column order; returns the row count."""
+    n = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(fieldnames)
+        for r in rows:
+            w.writerow(r)
+            n += 1
+    return n
+
+
+# Public suffixes with no multi-label ICANN entries beneath them: a plain host under
+# one of these needs no public suffix lookup to normalize
+_COMMON_SUFFIXES = frozenset({"com", "net", "org", "edu", "gov", "mil", "info", "biz"})
+
+
+@functools.lru_cache(maxsize=100_000)
 def norm_domain(url: str) -> Optional[str]:
     try:
         p = urlparse(url)
         if not p.netloc:
             return None
-        ext = tldextract.extract(p.netloc)
+        netloc = p.netloc
+        # Fast path: ASCII host without userinfo/port under a common suffix
+        if netloc.isascii() and "@" not in netloc and ":" not in netloc:
+            host = netloc.lower()
+            labels = host.split(".")
+            if len(labels) >= 2 and labels[-1] in _COMMON_SUFFIXES and all(labels):
+                # Same result tldextract gives: subdomain + domain + suffix rejoined
+                return host
+        ext = _TLD_EXTRACT(netloc)
         if not ext.domain:
-            return p.netloc.lower()
+            return netloc.lower()
         root = ".".join(part for part in [ext.domain, ext.suffix] if part)
         sub = ext.subdomain
         host = ".".join([sub, root]) if sub else root
@@ -185,13 +303,44 @@ def norm_domain(url: str) -> Optional[str]:
         return None
 
 
+@functools.lru_cache(maxsize=100_000)
 def parse_params(url: str) -> Dict[str, List[str]]:
+    # Cached: callers must treat the returned dict as read-only
     try:
         return parse_qs(urlparse(url).query, keep_blank_values=True)
     except Exception:
         return {}
 
 
+# utm_* / gclid pairs in a raw query string ("key", "key=" and "key=value" forms);
+# the lookahead keeps e.g. "gclid_src" from matching as "gclid"
+_UTM_RE = re.compile(r"(?:^|&)(utm_[^=&]*|gclid)(?=[=&]|$)(?:=([^&]*))?")
+
+
+@functools.lru_cache(maxsize=100_000)
+def parse_utms(url: str) -> Dict[str, List[str]]:
+    """
+    Like parse_params, but only extracts utm_* and gclid keys with one regex scan.
+    Values are only percent-decoded when they contain an escape. Queries with any
+    "%" go through parse_params instead, since an encoded key (utm%5Fsource) would
+    not match the regex. Cached: read-only result.
+    """
+    query = url.partition("#")[0].partition("?")[2]
+    if "%" in query:
+        return {k: v for k, v in parse_params(url).items() if k.startswith("utm_") or k == "gclid"}
+    out: Dict[str, List[str]] = {}
+    for m in _UTM_RE.finditer(query):
+        k = m.group(1)
+        if "+" in k:
+            k = unquote_plus(k)
+        v = m.group(2) or ""
+        if "+" in v:
+            v = unquote_plus(v)
+        out.setdefault(k, []).append(v)
+    return out
+
+
+@functools.lru_cache(maxsize=100_000)
 def is_https(url: str) -> bool:
     try:
         return urlparse(url).scheme.lower() == "https"
@@ -199,23 +348,98 @@ def is_https(url: str) -> bool:
         return False
 
 
+# One keep-alive pool for all probes so repeated hosts skip the TCP/TLS handshake
+_SESSION = requests.Session()
+_POOL_MAXSIZE = 64
+_ADAPTER = HTTPAdapter(pool_connections=64, pool_maxsize=_POOL_MAXSIZE, max_retries=0)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+
+def _ensure_pool_size(size: int) -> None:
+    """Grow the per-host pool so `size` probe threads never overflow it (urllib3 would discard connections)."""
+    global _ADAPTER, _POOL_MAXSIZE
+    if size <= _POOL_MAXSIZE:
+        return
+    _POOL_MAXSIZE = size
+    _ADAPTER = HTTPAdapter(pool_connections=64, pool_maxsize=size, max_retries=0)
+    _SESSION.mount("http://", _ADAPTER)
+    _SESSION.mount("https://", _ADAPTER)
+
+
 def http_probe(url: str, timeout: int = 5) -> Tuple[Optional[int], Optional[str]]:
     try:
         # HEAD first, fallback to GET when servers block HEAD
-        r = requests.head(url, allow_redirects=True, timeout=timeout)
+        r = _SESSION.head(url, allow_redirects=True, timeout=timeout)
         if r.status_code in (405, 403) and r.headers.get("allow", "").find("HEAD") == -1:
-            r = requests.get(url, allow_redirects=True, timeout=timeout)
+            r = _SESSION.get(url, allow_redirects=True, timeout=timeout)
         return r.status_code, r.url
     except Exception as e:
         return None, str(e)
 
 
-def fetch_stream(client: GoogleAdsClient, customer_id: str, query: str, api_version: str):
+@functools.lru_cache(maxsize=None)
+def http_probe_cached(url: str, timeout: int = 5) -> Tuple[Optional[int], Optional[str]]:
+    """http_probe memoized per (url, timeout) so each URL is fetched at most once per run."""
+    if _CACHE is not None:
+        hit = _CACHE.get_probe(url, timeout)
+        if hit is not None:
+            return hit
+    result = http_probe(url, timeout=timeout)
+    # Don't persist transport errors; they are usually transient
+    if _CACHE is not None and result[0] is not None:
+        _CACHE.put_probe(url, timeout, result)
+    return result
+
+
+def probe_all(urls: Iterable[str], timeout: int = 5, concurrency: int = 32) -> Dict[str, Tuple[Optional[int], Optional[str]]]:
+    """Probe each URL once, concurrently; returns url -> (status, final_url_or_error)."""
+    unique = list(dict.fromkeys(urls))
+    if not unique:
+        return {}
+    workers = max(1, min(concurrency, len(unique)))
+    _ensure_pool_size(workers)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        results = ex.map(lambda u: http_probe_cached(u, timeout), unique)
+        return dict(zip(unique, results))
+
+
+def fetch_batches(client: GoogleAdsClient, customer_id: str, query: str, api_version: str):
+    """Yield each search_stream batch's results as-is (one container per server batch)."""
+    cache = _CACHE
+    if cache is not None:
+        key = cache.gaql_key(customer_id, query, api_version)
+        serialize, deserialize = _row_codec(type(client.get_type("GoogleAdsRow", version=api_version)))
+        cached = cache.get_rows(key)
+        if cached is not None:
+            yield [deserialize(b) for b in cached]
+            return
     ga_service = client.get_service("GoogleAdsService", version=api_version)
     stream = ga_service.search_stream(customer_id=customer_id, query=query)
+    if cache is None:
+        for batch in stream:
+            yield batch.results
+        return
+    # Only store a result set once the stream has been read to the end
+    seen: List[bytes] = []
     for batch in stream:
-        for row in batch.results:
-            yield row
+        seen.extend(serialize(row) for row in batch.results)
+        yield batch.results
+    cache.put_rows(key, seen)
+
+
+def fetch_stream(client: GoogleAdsClient, customer_id: str, query: str, api_version: str):
+    for results in fetch_batches(client, customer_id, query, api_version):
+        yield from results
+
+def fetch_search(client: GoogleAdsClient, customer_id: str, query: str, api_version: str):
+    """
+    Unary search for small result sets (a page or less), avoiding the streaming
+    setup cost of search_stream. The pager fetches further pages if any.
+    """
+    ga_service = client.get_service("GoogleAdsService", version=api_version)
+    yield from ga_service.search(customer_id=customer_id, query=query)
+
 
 def fetch_sitelink_asset_details(client, asset_resource_names, api_version):
     svc = client.get_service("AssetService", version=api_version)
@@ -223,10 +447,10 @@ def fetch_sitelink_asset_details(client, asset_resource_names, api_version):
     for rn in asset_resource_names:
         try:
             a = svc.get_asset(resource_name=rn)
-            if a.type_.name == "SITELINK" and getattr(a, "sitelink_asset", None):
+            if a.type_.name == "SITELINK" and a.sitelink_asset:
                 details[rn] = {
-                    "final_urls": list(getattr(a.sitelink_asset, "final_urls", [])),
-                    "final_mobile_urls": list(getattr(a.sitelink_asset, "final_mobile_urls", [])),
+                    "final_urls": list(a.sitelink_asset.final_urls),
+                    "final_mobile_urls": list(a.sitelink_asset.final_mobile_urls),
                     "link_text": a.sitelink_asset.link_text,
                 }
         except Exception:
@@ -237,94 +461,89 @@ def fetch_sitelink_asset_details(client, asset_resource_names, api_version):
 
 def rows_ads(client: GoogleAdsClient, customer_id: str, api_version: str) -> List[Dict[str, Any]]:
     out = []
-    for row in fetch_stream(client, customer_id, GAQL_ADS, api_version):
-        ad = row.ad_group_ad.ad
-        out.append({
-            "customer_id": row.customer.id,
-            "campaign_id": row.campaign.id,
-            "campaign_name": row.campaign.name,
-            "ad_group_id": row.ad_group.id,
-            "ad_group_name": row.ad_group.name,
-            "ad_id": ad.id,
-            "ad_name": ad.name if getattr(ad, "name", None) else "",
-            "ad_type": ad.type_.name if hasattr(ad.type_, "name") else str(ad.type_),
-            "ad_status": row.ad_group_ad.status.name,
-            "ad_strength": row.ad_group_ad.ad_strength.name if hasattr(row.ad_group_ad.ad_strength, "name") else str(row.ad_group_ad.ad_strength),
-            "policy_status": row.ad_group_ad.policy_summary.approval_status.name,
-            "final_urls": [u for u in ad.final_urls],
-            "final_mobile_urls": [u for u in ad.final_mobile_urls],
-            "display_url": ad.display_url if getattr(ad, "display_url", None) else "",
-            "tracking_url_template": ad.tracking_url_template if getattr(ad, "tracking_url_template", None) else "",
-            "url_custom_parameters": [{"key": p.key, "value": p.value} for p in ad.url_custom_parameters],
-        })
+    append = out.append
+    for results in fetch_batches(client, customer_id, GAQL_ADS, api_version):
+        for row in results:
+            aga = row.ad_group_ad
+            ad = aga.ad
+            campaign = row.campaign
+            ad_group = row.ad_group
+            append({
+                "customer_id": row.customer.id,
+                "campaign_id": campaign.id,
+                "campaign_name": campaign.name,
+                "ad_group_id": ad_group.id,
+                "ad_group_name": ad_group.name,
+                "ad_id": ad.id,
+                "ad_name": ad.name,
+                "ad_type": ad.type_.name if hasattr(ad.type_, "name") else str(ad.type_),
+                "ad_status": aga.status.name,
+                "ad_strength": aga.ad_strength.name if hasattr(aga.ad_strength, "name") else str(aga.ad_strength),
+                "policy_status": aga.policy_summary.approval_status.name,
+                "final_urls": list(ad.final_urls),
+                "final_mobile_urls": list(ad.final_mobile_urls),
+                "display_url": ad.display_url,
+                "tracking_url_template": ad.tracking_url_template,
+                "url_custom_parameters": [{"key": p.key, "value": p.value} for p in ad.url_custom_parameters],
+            })
     return out
 
 
-def rows_ad_url_crosswalk(ads_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def rows_ad_url_crosswalk(ads_rows: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
     """Create one row per (ad_id, url, source) for easy lookups in UI."""
-    x = []
     for r in ads_rows:
         for u in r.get("final_urls", []) or []:
-            x.append({
+            yield {
                 "ad_id": r["ad_id"],
                 "campaign_id": r["campaign_id"],
                 "ad_group_id": r["ad_group_id"],
                 "url": u,
-                "url_no_query": u.split("?", 1)[0],
+                "url_no_query": u.partition("?")[0],
                 "source": "ad.final_urls",
-            })
+            }
         for u in r.get("final_mobile_urls", []) or []:
-            x.append({
+            yield {
                 "ad_id": r["ad_id"],
                 "campaign_id": r["campaign_id"],
                 "ad_group_id": r["ad_group_id"],
                 "url": u,
-                "url_no_query": u.split("?", 1)[0],
+                "url_no_query": u.partition("?")[0],
                 "source": "ad.final_mobile_urls",
-            })
-    return x
+            }
 
 
-def rows_rsa_assets(client: GoogleAdsClient, customer_id: str, api_version: str) -> List[Dict[str, Any]]:
-    out = []
-    for row in fetch_stream(client, customer_id, GAQL_RSA_ASSETS, api_version):
-        out.append({
-            "campaign_id": row.campaign.id,
-            "ad_group_id": row.ad_group.id,
-            "ad_id": row.ad_group_ad.ad.id,
-            "ad_status": row.ad_group_ad.status.name,
-            "field_type": row.ad_group_ad_asset_view.field_type.name,
-            "asset_enabled": row.ad_group_ad_asset_view.enabled,
-            "text": row.asset.text_asset.text if getattr(row.asset, "text_asset", None) else "",
-            "asset_policy_status": row.asset.policy_summary.approval_status.name if getattr(row.asset, "policy_summary", None) else "",
-        })
-    return out
+def rows_rsa_assets(client: GoogleAdsClient, customer_id: str, api_version: str) -> Iterator[Dict[str, Any]]:
+    for results in fetch_batches(client, customer_id, GAQL_RSA_ASSETS, api_version):
+        for row in results:
+            aga = row.ad_group_ad
+            view = row.ad_group_ad_asset_view
+            asset = row.asset
+            yield {
+                "campaign_id": row.campaign.id,
+                "ad_group_id": row.ad_group.id,
+                "ad_id": aga.ad.id,
+                "ad_status": aga.status.name,
+                "field_type": view.field_type.name,
+                "asset_enabled": view.enabled,
+                "text": asset.text_asset.text,
+                "asset_policy_status": asset.policy_summary.approval_status.name if asset.policy_summary else "",
+            }
 
 
-def rows_landing_pages(client: GoogleAdsClient, customer_id: str, api_version: str) -> List[Dict[str, Any]]:
-    out = []
-    for row in fetch_stream(client, customer_id, GAQL_LANDING_PAGES, api_version):
-        url = row.landing_page_view.unexpanded_final_url
-        out.append({
-            "customer_id": row.customer.id,
-            "unexpanded_final_url": url,
-            "clicks_last_30d": row.metrics.clicks,
-            "impressions_last_30d": row.metrics.impressions,
-        })
-    return out
+def rows_landing_pages(client: GoogleAdsClient, customer_id: str, api_version: str) -> Iterator[Tuple[Any, ...]]:
+    """Yield (customer_id, unexpanded_final_url, clicks_last_30d, impressions_last_30d) tuples."""
+    for results in fetch_batches(client, customer_id, GAQL_LANDING_PAGES, api_version):
+        for row in results:
+            metrics = row.metrics
+            yield (row.customer.id, row.landing_page_view.unexpanded_final_url, metrics.clicks, metrics.impressions)
 
 
-def rows_expanded_landing_pages(client: GoogleAdsClient, customer_id: str, api_version: str) -> List[Dict[str, Any]]:
-    out = []
-    for row in fetch_stream(client, customer_id, GAQL_EXPANDED_LANDING_PAGES, api_version):
-        url = row.expanded_landing_page_view.expanded_final_url
-        out.append({
-            "customer_id": row.customer.id,
-            "expanded_final_url": url,
-            "clicks_last_30d": row.metrics.clicks,
-            "impressions_last_30d": row.metrics.impressions,
-        })
-    return out
+def rows_expanded_landing_pages(client: GoogleAdsClient, customer_id: str, api_version: str) -> Iterator[Tuple[Any, ...]]:
+    """Yield (customer_id, expanded_final_url, clicks_last_30d, impressions_last_30d) tuples."""
+    for results in fetch_batches(client, customer_id, GAQL_EXPANDED_LANDING_PAGES, api_version):
+        for row in results:
+            metrics = row.metrics
+            yield (row.customer.id, row.expanded_landing_page_view.expanded_final_url, metrics.clicks, metrics.impressions)
 
 
 def rows_utm_analysis(ads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -540,13 +759,13 @@ def rows_sitelinks(client: GoogleAdsClient, customer_id: str, api_version: str)
         
         for row in fetch_stream(client, customer_id, sitelink_query, api_version):
             a = row.asset
-            final_urls = list(getattr(a.sitelink_asset, 'final_urls', []))
-            final_mobile_urls = list(getattr(a.sitelink_asset, 'final_mobile_urls', []))
+            final_urls = list(a.sitelink_asset.final_urls)
+            final_mobile_urls = list(a.sitelink_asset.final_mobile_urls)
             
             assets[a.resource_name] = {
                 "asset_id": a.id,
-                "asset_name": getattr(a, "name", "") or "",
-                "link_text": getattr(a.sitelink_asset, 'link_text', ''),
+                "asset_name": a.name,
+                "link_text": a.sitelink_asset.link_text,
                 "final_urls": final_urls,
                 "final_mobile_urls": final_mobile_urls,
             }
@@ -557,8 +776,8 @@ def rows_sitelinks(client: GoogleAdsClient, customer_id: str, api_version: str)
                 a = row.asset
                 assets[a.resource_name] = {
                     "asset_id": a.id,
-                    "asset_name": getattr(a, "name", "") or "",
-                    "link_text": getattr(a.sitelink_asset, 'link_text', ''),
+                    "asset_name": a.name,
+                    "link_text": a.sitelink_asset.link_text,
                     "final_urls": [],
                     "final_mobile_urls": [],
                     "url_fetch_error": str(e),
@@ -579,11 +798,11 @@ def rows_sitelinks(client: GoogleAdsClient, customer_id: str, api_version: str)
             "final_urls": a.get("final_urls", []),
             "final_mobile_urls": a.get("final_mobile_urls", []),
             "campaign_id": row.campaign.id,
-            "campaign_name": getattr(row.campaign, 'name', ''),
+            "campaign_name": row.campaign.name,
             "ad_group_id": "",
             "ad_group_name": "",
             "placement": "campaign",
-            "placement_status": getattr(row.campaign_asset, 'status', ''),
+            "placement_status": row.campaign_asset.status,
             "url_fetch_error": a.get("url_fetch_error", ""),
         })
 
@@ -599,11 +818,11 @@ def rows_sitelinks(client: GoogleAdsClient, customer_id: str, api_version: str)
             "final_urls": a.get("final_urls", []),
             "final_mobile_urls": a.get("final_mobile_urls", []),
             "campaign_id": row.campaign.id,
-            "campaign_name": getattr(row.campaign, 'name', ''),
+            "campaign_name": row.campaign.name,
             "ad_group_id": row.ad_group.id,
-            "ad_group_name": getattr(row.ad_group, 'name', ''),
+            "ad_group_name": row.ad_group.name,
             "placement": "ad_group",
-            "placement_status": getattr(row.ad_group_asset, 'status', ''),
+            "placement_status": row.ad_group_asset.status,
             "url_fetch_error": a.get("url_fetch_error", ""),
         })
 
@@ -621,8 +840,76 @@ def audit_findings(
     utm_expect_regex: Dict[str, str],
     utm_case: Optional[str],
     allow_autotag_only: bool,
+    http_concurrency: int = 32,
 ) -> List[Dict[str, Any]]:
     findings = []
+    # Expectations are fixed for the whole run; compile/freeze them once
+    required = tuple(utm_required)
+    expect_exact = list(utm_expect_exact.items())
+    expect_regex = [(k, pattern, re.compile(pattern)) for k, pattern in utm_expect_regex.items()]
+    normalize = str.lower if utm_case == "lower" else str.upper if utm_case == "upper" else None
+    # The regex scan covers utm_*/gclid only; fall back to full parsing for other configured keys
+    keys = [*required, *utm_expect_exact, *utm_expect_regex]
+    parse = parse_utms if all(k.startswith("utm_") or k == "gclid" for k in keys) else parse_params
+    # Probe all distinct final URLs up front instead of one blocking request per ad
+    probes: Dict[str, Tuple[Optional[int], Optional[str]]] = {}
+    if check_http:
+        probes = probe_all(
+            (u for ad in ads for u in (ad.get("final_urls") or [])),
+            timeout=timeout,
+            concurrency=http_concurrency,
+        )
+
+    def url_level(u: str) -> List[Tuple[str, str, str]]:
+        """(severity, issue, detail) findings for one URL; they depend only on the URL string."""
+        out = []
+        if not is_https(u):
+            out.append(("warn", "Non-HTTPS final URL", u))
+        qs = parse(u)
+        # Skip UTM checks when gclid present (optional)
+        if allow_autotag_only and "gclid" in qs:
+            pass
+        else:
+            # Required keys present?
+            missing = [k for k in required if k not in qs]
+            if missing:
+                out.append(("warn", "UTM missing", f"{u} missing {','.join(missing)}"))
+            # Empty or duplicate values
+            for k, vals in qs.items():
+                if k.startswith("utm_"):
+                    if any(v == "" for v in vals):
+                        out.append(("warn", "UTM empty value", f"{u} {k}="))
+                    if len(vals) > 1:
+                        out.append(("info", "UTM duplicate parameter", f"{u} {k} has {len(vals)} values"))
+                    if normalize and any(v != normalize(v) for v in vals):
+                        out.append(("info", "UTM case policy", f"{u} {k} not {utm_case}"))
+            # Exact value expectations
+            for k, expected in expect_exact:
+                if k in qs:
+                    val = qs[k][0]
+                    if val != expected:
+                        out.append(("warn", "UTM mismatch (exact)", f"{u} {k}='{val}' != '{expected}'"))
+            # Regex expectations
+            for k, pattern, rx in expect_regex:
+                if k in qs:
+                    val = qs[k][0]
+                    if rx.fullmatch(val) is None:
+                        out.append(("warn", "UTM mismatch (pattern)", f"{u} {k}='{val}' !~ /{pattern}/"))
+        if check_http:
+            code, note = probes[u]
+            if code is None:
+                out.append(("error", "HTTP check failed", f"{u} error={note}"))
+            elif code >= 400:
+                out.append(("error", "HTTP non-2xx", f"{u} status={code}"))
+        return out
+
+    # Evaluate each distinct URL once; ads sharing a URL reuse the same verdicts
+    url_findings: Dict[str, List[Tuple[str, str, str]]] = {}
+    for ad in ads:
+        for u in ad.get("final_urls") or []:
+            if u not in url_findings:
+                url_findings[u] = url_level(u)
+
     for ad in ads:
         ad_id = ad["ad_id"]
         display_host = norm_domain(ad.get("display_url") or "") if ad.get("display_url") else None
@@ -630,130 +917,32 @@ def audit_findings(
         final_urls = ad.get("final_urls") or []
         mobile_urls = ad.get("final_mobile_urls") or []
         template = ad.get("tracking_url_template") or ""
+        ad_findings: List[Tuple[str, str, str]] = []
 
         if not final_urls:
-            findings.append({
-                "ad_id": ad_id,
-                "severity": "error",
-                "issue": "No final_urls set",
-                "detail": "",
-            })
+            ad_findings.append(("error", "No final_urls set", ""))
 
         if display_host:
             for u in final_urls:
                 host = norm_domain(u)
                 if host and host != display_host:
-                    findings.append({
-                        "ad_id": ad_id,
-                        "severity": "warn",
-                        "issue": "Domain mismatch",
-                        "detail": f"display={display_host} final={host} ({u})",
-                    })
+                    ad_findings.append(("warn", "Domain mismatch", f"display={display_host} final={host} ({u})"))
 
         for u in final_urls:
-            if not is_https(u):
-                findings.append({
-                    "ad_id": ad_id,
-                    "severity": "warn",
-                    "issue": "Non-HTTPS final URL",
-                    "detail": u,
-                })
-            qs = parse_params(u)
-            # Skip UTM checks when gclid present (optional)
-            if allow_autotag_only and "gclid" in qs:
-                pass
-            else:
-                # Required keys present?
-                missing = [k for k in utm_required if k not in qs]
-                if missing:
-                    findings.append({
-                        "ad_id": ad_id,
-                        "severity": "warn",
-                        "issue": "UTM missing",
-                        "detail": f"{u} missing {','.join(missing)}",
-                    })
-                # Empty or duplicate values
-                for k, vals in qs.items():
-                    if k.startswith("utm_"):
-                        if any(v == "" for v in vals):
-                            findings.append({
-                                "ad_id": ad_id,
-                                "severity": "warn",
-                                "issue": "UTM empty value",
-                                "detail": f"{u} {k}=",
-                            })
-                        if len(vals) > 1:
-                            findings.append({
-                                "ad_id": ad_id,
-                                "severity": "info",
-                                "issue": "UTM duplicate parameter",
-                                "detail": f"{u} {k} has {len(vals)} values",
-                            })
-                        if utm_case in ("lower", "upper"):
-                            bad = [v for v in vals if (v != (v.lower() if utm_case == 'lower' else v.upper()))]
-                            if bad:
-                                findings.append({
-                                    "ad_id": ad_id,
-                                    "severity": "info",
-                                    "issue": "UTM case policy",
-                                    "detail": f"{u} {k} not {utm_case}",
-                                })
-                # Exact value expectations
-                for k, expected in utm_expect_exact.items():
-                    if k in qs:
-                        val = qs[k][0]
-                        if val != expected:
-                            findings.append({
-                                "ad_id": ad_id,
-                                "severity": "warn",
-                                "issue": "UTM mismatch (exact)",
-                                "detail": f"{u} {k}='{val}' != '{expected}'",
-                            })
-                # Regex expectations
-                for k, pattern in utm_expect_regex.items():
-                    if k in qs:
-                        val = qs[k][0]
-                        if re.fullmatch(pattern, val) is None:
-                            findings.append({
-                                "ad_id": ad_id,
-                                "severity": "warn",
-                                "issue": "UTM mismatch (pattern)",
-                                "detail": f"{u} {k}='{val}' !~ /{pattern}/",
-                            })
-            if check_http:
-                code, note = http_probe(u, timeout=timeout)
-                if code is None:
-                    findings.append({
-                        "ad_id": ad_id,
-                        "severity": "error",
-                        "issue": "HTTP check failed",
-                        "detail": f"{u} error={note}",
-                    })
-                elif code >= 400:
-                    findings.append({
-                        "ad_id": ad_id,
-                        "severity": "error",
-                        "issue": "HTTP non-2xx",
-                        "detail": f"{u} status={code}",
-                    })
+            ad_findings.extend(url_findings[u])
 
         if mobile_urls == [] and final_urls:
-            findings.append({
-                "ad_id": ad_id,
-                "severity": "info",
-                "issue": "No final_mobile_urls",
-                "detail": "Consider mobile-specific URLs if site differs",
-            })
+            ad_findings.append(("info", "No final_mobile_urls", "Consider mobile-specific URLs if site differs"))
 
         if template:
             # sanity: tracking templates usually contain {lpurl}
             if "{lpurl" not in template.lower():
-                findings.append({
-                    "ad_id": ad_id,
-                    "severity": "warn",
-                    "issue": "Tracking template missing {lpurl}",
-                    "detail": template,
-                })
+                ad_findings.append(("warn", "Tracking template missing {lpurl}", template))
+
+        findings.extend(
+            {"ad_id": ad_id, "severity": sev, "issue": issue, "detail": detail}
+            for sev, issue, detail in ad_findings
+        )
 
     return findings
 
@@ -768,6 +957,8 @@ def main():
                         help="Google Ads API version (e.g., v21)")
     parser.add_argument("--check-http", action="store_true", help="Probe final URLs via HTTP")
     parser.add_argument("--timeout", type=int, default=5, help="HTTP probe timeout (seconds)")
+    parser.add_argument("--http-concurrency", type=int, default=32,
+                        help="Max concurrent HTTP probes when --check-http is set (default: 32)")
     parser.add_argument("--login-customer-id", help="Manager account (MCC) ID without dashes to use as login_customer_id")
     parser.add_argument("--list-accounts", action="store_true",
                         help="List account resource names and exit")
@@ -784,10 +975,20 @@ def main():
                         help="Enforce case for UTM values (default: none)")
     parser.add_argument("--allow-autotag-only", action="store_true",
                         help="If gclid present, skip UTM checks for that URL")
+    # On-disk cache across runs
+    parser.add_argument("--cache-dir",
+                        help="Cache GAQL rows (24h) and HTTP probe results (1h) in SQLite under this directory")
+    parser.add_argument("--cache-refresh", action="store_true",
+                        help="Ignore cached entries and overwrite them with fresh results")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the on-disk cache even if --cache-dir is set")
     args = parser.parse_args()
 
     ensure_out_dir(args.out)
 
+    global _CACHE
+    if args.cache_dir and not args.no_cache:
+        _CACHE = DiskCache(args.cache_dir, refresh=args.cache_refresh)
+
     try:
         client = GoogleAdsClient.load_from_storage()
         if args.login_customer_id:
@@ -806,7 +1007,6 @@ def main():
         return
     if args.describe_accounts:
         cust_svc = client.get_service("CustomerService", version=args.api_version)
-        ga_svc = client.get_service("GoogleAdsService", version=args.api_version)
         res = cust_svc.list_accessible_customers()
         print("# Accounts:")
         for rn in res.resource_names:
@@ -815,12 +1015,11 @@ def main():
                  "customer.currency_code, customer.time_zone, "
                  "customer.manager FROM customer LIMIT 1")
             try:
-                for b in ga_svc.search_stream(customer_id=cid, query=q):
-                    for row in b.results:
-                        c = row.customer
-                        print(f"{cid}\tname='{c.descriptive_name}'\t"
-                              f"currency={c.currency_code}\ttz={c.time_zone}\t"
-                              f"manager={c.manager}")
+                for row in fetch_search(client, cid, q, args.api_version):
+                    c = row.customer
+                    print(f"{cid}\tname='{c.descriptive_name}'\t"
+                          f"currency={c.currency_code}\ttz={c.time_zone}\t"
+                          f"manager={c.manager}")
             except Exception as e:
                 print(f"{cid}\t(error: {e})")
         return
@@ -830,30 +1029,55 @@ def main():
         print("--customer-id is required unless --list-accounts is used", file=sys.stderr)
         sys.exit(2)
 
-    try:
-        print("Fetching enabled ads ...", file=sys.stderr)
-        ads = rows_ads(client, args.customer_id, args.api_version)
-        print(f"  ads: {len(ads)}", file=sys.stderr)
-
-        print("Fetching RSA assets ...", file=sys.stderr)
-        rsa = rows_rsa_assets(client, args.customer_id, args.api_version)
-        print(f"  assets: {len(rsa)}", file=sys.stderr)
-
-        print("Fetching landing pages (last 30d) ...", file=sys.stderr)
-        lps = rows_landing_pages(client, args.customer_id, args.api_version)
-        print(f"  landing pages: {len(lps)}", file=sys.stderr)
+    # Reports that nothing else consumes are written to disk as rows arrive,
+    # into .partial files that only replace the real CSVs once the run succeeds
+    rsa_path = os.path.join(args.out, "rsa_assets.csv")
+    lps_path = os.path.join(args.out, "landing_pages.csv")
+    elps_path = os.path.join(args.out, "expanded_landing_pages.csv")
+    partials = [p + ".partial" for p in (rsa_path, lps_path, elps_path)]
+    rsa_tmp, lps_tmp, elps_tmp = partials
 
-        print("Fetching expanded landing pages (last 30d) ...", file=sys.stderr)
-        try:
-            elps = rows_expanded_landing_pages(client, args.customer_id, args.api_version)
-            print(f"  expanded landing pages: {len(elps)}", file=sys.stderr)
-        except Exception:
-            elps = []
-            print("  expanded landing pages: (not available)", file=sys.stderr)
+    try:
+        # The five reports are independent gRPC streams; fetch them in parallel
+        print("Fetching ads, RSA assets, landing pages (last 30d) and sitelinks ...", file=sys.stderr)
+        cid, ver = args.customer_id, args.api_version
+        with ThreadPoolExecutor(max_workers=5) as ex:
+            f_ads = ex.submit(rows_ads, client, cid, ver)
+            f_rsa = ex.submit(
+                lambda: write_csv(
+                    rsa_tmp,
+                    rows_rsa_assets(client, cid, ver),
+                    ["campaign_id","ad_group_id","ad_id","ad_status","field_type","asset_enabled","text","asset_policy_status"],
+                )
+            )
+            f_lps = ex.submit(
+                lambda: write_csv_tuples(
+                    lps_tmp,
+                    rows_landing_pages(client, cid, ver),
+                    ["customer_id","unexpanded_final_url","clicks_last_30d","impressions_last_30d"],
+                )
+            )
+            f_elps = ex.submit(
+                lambda: write_csv_tuples(
+                    elps_tmp,
+                    rows_expanded_landing_pages(client, cid, ver),
+                    ["customer_id","expanded_final_url","clicks_last_30d","impressions_last_30d"],
+                )
+            )
+            f_sitelinks = ex.submit(rows_sitelinks, client, cid, ver)
 
-        print("Fetching sitelinks ...", file=sys.stderr)
-        sitelinks = rows_sitelinks(client, args.customer_id, args.api_version)
-        print(f"  sitelink assets: {len(sitelinks)}", file=sys.stderr)
+            ads = f_ads.result()
+            print(f"  ads: {len(ads)}", file=sys.stderr)
+            print(f"  assets: {f_rsa.result()}", file=sys.stderr)
+            print(f"  landing pages: {f_lps.result()}", file=sys.stderr)
+            try:
+                n_elps = f_elps.result()
+                print(f"  expanded landing pages: {n_elps}", file=sys.stderr)
+            except Exception:
+                n_elps = 0
+                print("  expanded landing pages: (not available)", file=sys.stderr)
+            sitelinks = f_sitelinks.result()
+            print(f"  sitelink assets: {len(sitelinks)}", file=sys.stderr)
 
         print("Auditing URLs ...", file=sys.stderr)
         # Parse expectations into dicts
@@ -880,6 +1104,7 @@ def main():
             utm_expect_regex=expect_regex,
             utm_case=utm_case,
             allow_autotag_only=args.allow_autotag_only,
+            http_concurrency=args.http_concurrency,
         )
         print(f"  findings: {len(findings)}", file=sys.stderr)
 
@@ -892,7 +1117,11 @@ def main():
         homepage_analysis = rows_non_homepage_analysis(ads, sitelinks)
         print(f"  Homepage analysis rows: {len(homepage_analysis)}", file=sys.stderr)
 
-        # Write CSVs
+        # Write CSVs (an empty expanded landing pages report is not written)
+        os.replace(rsa_tmp, rsa_path)
+        os.replace(lps_tmp, lps_path)
+        if n_elps:
+            os.replace(elps_tmp, elps_path)
         write_csv(
             os.path.join(args.out, "ads.csv"),
             ads,
@@ -902,26 +1131,9 @@ def main():
                 "final_urls","final_mobile_urls","display_url","tracking_url_template","url_custom_parameters"
             ],
         )
-        write_csv(
-            os.path.join(args.out, "rsa_assets.csv"),
-            rsa,
-            ["campaign_id","ad_group_id","ad_id","ad_status","field_type","asset_enabled","text","asset_policy_status"],
-        )
-        write_csv(
-            os.path.join(args.out, "landing_pages.csv"),
-            lps,
-            ["customer_id","unexpanded_final_url","clicks_last_30d","impressions_last_30d"],
-        )
-        if elps:
-            write_csv(
-                os.path.join(args.out, "expanded_landing_pages.csv"),
-                elps,
-                ["customer_id","expanded_final_url","clicks_last_30d","impressions_last_30d"],
-            )
-        cross = rows_ad_url_crosswalk(ads)
         write_csv(
             os.path.join(args.out, "ad_url_map.csv"),
-            cross,
+            rows_ad_url_crosswalk(ads),
             ["ad_id","campaign_id","ad_group_id","url","url_no_query","source"],
         )
         write_csv(
@@ -952,6 +1164,11 @@ def main():
         for e in ex.failure.errors:
             print(f"  - {e.error_code}: {e.message}", file=sys.stderr)
         sys.exit(2)
+    finally:
+        # Streamed reports from a failed or empty fetch are not kept
+        for p in partials:
+            if os.path.exists(p):
+                os.remove(p)
 
 
 if __name__ == "__main__":
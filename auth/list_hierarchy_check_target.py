@@ -1,12 +1,50 @@
 #!/usr/bin/env python3
+import argparse, json, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 from google.ads.googleads.client import GoogleAdsClient
 
 TARGET = "2091137189"
 
+ap = argparse.ArgumentParser(description=f"Check whether the current OAuth user can see customer {TARGET}.")
+ap.add_argument("--refresh", action="store_true",
+                help="Ignore cached child-account listings and query them again")
+args = ap.parse_args()
+
 client = GoogleAdsClient.load_from_storage()
 ga = client.get_service("GoogleAdsService")
 
-def list_children(parent_id: str):
+# customer_client results per (login customer, parent), reused across runs for CACHE_TTL seconds
+CACHE_PATH = os.path.expanduser("~/.cache/google-ads-hierarchy.json")
+CACHE_TTL = 3600
+_cache_lock = threading.Lock()
+
+def _load_cache():
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+_cache = _load_cache()
+
+def save_cache():
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    with _cache_lock:
+        data = json.dumps(_cache)
+    with open(CACHE_PATH, "w", encoding="utf-8") as f:
+        f.write(data)
+
+@lru_cache(maxsize=None)
+def fetch_children(parent_id: str):
+    # Which children are visible depends on the login customer, so it is part of the key
+    key = f"{client.login_customer_id or ''}:{parent_id}"
+    with _cache_lock:
+        hit = _cache.get(key)
+    if hit and not args.refresh and time.time() - hit["ts"] < CACHE_TTL:
+        return tuple(tuple(c) for c in hit["children"])
+
     q = """
       SELECT
         customer_client.client_customer,
@@ -16,13 +54,21 @@ def list_children(parent_id: str):
       FROM customer_client
       WHERE customer_client.level <= 1
     """
-    print(f"\nUnder manager/customer {parent_id}:")
-    found = False
+    out = []
     for row in ga.search(customer_id=parent_id, query=q):
         cid = row.customer_client.client_customer.split("/")[-1]
-        name = row.customer_client.descriptive_name
-        lvl = row.customer_client.level
-        hidden = row.customer_client.hidden
+        out.append((cid, row.customer_client.descriptive_name,
+                    row.customer_client.level, row.customer_client.hidden))
+    with _cache_lock:
+        _cache[key] = {"ts": time.time(), "children": out}
+    return tuple(out)
+
+def list_children(parent_id: str, children=None):
+    if children is None:
+        children = fetch_children(parent_id)
+    print(f"\nUnder manager/customer {parent_id}:")
+    found = False
+    for cid, name, lvl, hidden in children:
         print(f" - {cid} | level={lvl} | hidden={hidden} | name={name}")
         if cid == TARGET:
             found = True
@@ -33,12 +79,21 @@ def list_children(parent_id: str):
 # Start from the "accessible" roots we printed before
 roots = ["2975516290","8630268244","9369249870"]
 found_any = False
-for rid in roots:
-    try:
-        if list_children(rid):
-            found_any = True
-    except Exception as e:
-        print(f"(note) Could not enumerate under {rid}: {e}")
+# One search per root (a query can't span login customers); run them concurrently,
+# then print in root order so output doesn't interleave
+with ThreadPoolExecutor(max_workers=len(roots)) as ex:
+    futures = [(rid, ex.submit(fetch_children, rid)) for rid in roots]
+    for rid, fut in futures:
+        try:
+            if list_children(rid, fut.result()):
+                found_any = True
+        except Exception as e:
+            print(f"(note) Could not enumerate under {rid}: {e}")
+
+try:
+    save_cache()
+except OSError as e:
+    print(f"(note) Could not write hierarchy cache {CACHE_PATH}: {e}")
 
 if not found_any:
     print("\n❌ Target not found under any root. Likely the OAuth user isn’t linked to that client.")
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # expand_geo.py
 import csv, argparse, itertools
+from functools import lru_cache
 
 STATES = [
  "Alabama","Alaska","Arizona","Arkansas","California","Colorado","Connecticut","Delaware",
@@ -39,35 +40,39 @@ COUNTIES = [
  # "Gwinnett County","Cobb County","Orange County","Harris County"
 ]
 
-def variants_for_geo(kw: str, geo: str):
-    """Generate prefix/suffix, with and without 'in '"""
-    g = geo
-    return {
-        f"{kw} in {g}",
-        f"{kw} {g}",
-        f"{g} {kw}",
-    }
+@lru_cache(maxsize=None)
+def geo_tokens(use_states=True, use_abbrev=True, use_metros=True, use_counties=False):
+    """Flat tuple of every active geo token (abbreviations only apply with states)"""
+    tokens = []
+    if use_states:
+        tokens += STATES
+        if use_abbrev:
+            tokens += [STATE_ABBREV[st] for st in STATES]
+    if use_metros:
+        tokens += METROS
+    if use_counties:
+        tokens += COUNTIES
+    return tuple(tokens)
+
+def make_expander(tokens):
+    # flag set is fixed for the run, so bind the active tokens once and return a flat expander
+    def expand(kw):
+        r = [kw]
+        r += [f"{kw} in {g}" for g in tokens]
+        r += [f"{kw} {g}" for g in tokens]
+        r += [f"{g} {kw}" for g in tokens]
+        return r
+    return expand
 
 def expand_keywords(keywords, use_states=True, use_abbrev=True, use_metros=True, use_counties=False):
-    out = set()
-    for kw in keywords:
-        kw = " ".join(kw.split())  # collapse spaces
-        base = {kw}
-        out |= base
-        if use_states:
-            for st in STATES:
-                out |= variants_for_geo(kw, st)
-                if use_abbrev:
-                    out |= variants_for_geo(kw, STATE_ABBREV[st])
-        if use_metros:
-            for m in METROS:
-                out |= variants_for_geo(kw, m)
-        if use_counties:
-            for c in COUNTIES:
-                out |= variants_for_geo(kw, c)
-    # Normalize whitespace and dedupe again
-    cleaned = sorted({" ".join(x.split()) for x in out})
-    return cleaned
+    expand = make_expander(geo_tokens(use_states, use_abbrev, use_metros, use_counties))
+    # keywords arrive space-collapsed (see main) and geo tokens have single spaces,
+    # so variants are already clean
+    out = set(itertools.chain.from_iterable(map(expand, keywords)))
+    # sort in place for deterministic, diffable output
+    result = list(out)
+    result.sort()
+    return result
 
 def main():
     ap = argparse.ArgumentParser()
@@ -84,9 +89,9 @@ def main():
     ap.add_argument("--counties", action="store_true")    # off by default; turn on explicitly
     args = ap.parse_args()
 
-    # load seeds
+    # load seeds, collapsing spaces once here
     with open(args.input_txt, "r", encoding="utf-8") as f:
-        seeds = [ln.strip() for ln in f if ln.strip()]
+        seeds = [s for ln in f if (s := " ".join(ln.split()))]
 
     expanded = expand_keywords(
         seeds,
@@ -96,11 +101,13 @@ def main():
         use_counties=args.counties,
     )
 
-    with open(args.output_csv, "w", newline="", encoding="utf-8") as f:
+    # every column except Keyword is constant across rows
+    prefix = (args.action, args.status, args.campaign, args.adgroup)
+    suffix = (args.match,)
+    with open(args.output_csv, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
         w = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
         w.writerow(["Action","Keyword status","Campaign","Ad group","Keyword","Match type"])
-        for kw in expanded:
-            w.writerow([args.action, args.status, args.campaign, args.adgroup, kw, args.match])
+        w.writerows(prefix + (kw,) + suffix for kw in expanded)
 
 if __name__ == "__main__":
     main()
@@ -10,9 +10,51 @@ Rebuild legacy Expanded Text Ads (ETAs) as Responsive Search Ads (RSAs).
 """
 
 import argparse
+import hashlib
+import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
 from google.ads.googleads.client import GoogleAdsClient
 
 
+# GAQL templates; filled per call with str.format_map.
+_Q_RSA_FP = """
+  SELECT
+    ad_group_ad.ad.responsive_search_ad.headlines,
+    ad_group_ad.ad.responsive_search_ad.descriptions,
+    ad_group_ad.ad.responsive_search_ad.path1,
+    ad_group_ad.ad.responsive_search_ad.path2,
+    ad_group_ad.ad.final_urls
+  FROM ad_group_ad
+  WHERE ad_group_ad.ad_group = 'customers/{customer_id}/adGroups/{ad_group_id}'
+    AND ad_group_ad.ad.type = RESPONSIVE_SEARCH_AD
+"""
+
+_Q_ETAS = """
+  SELECT
+    ad_group_ad.status,
+    ad_group_ad.ad.final_urls,
+    ad_group_ad.ad.expanded_text_ad.headline_part1,
+    ad_group_ad.ad.expanded_text_ad.headline_part2,
+    ad_group_ad.ad.expanded_text_ad.headline_part3,
+    ad_group_ad.ad.expanded_text_ad.description,
+    ad_group_ad.ad.expanded_text_ad.description2,
+    ad_group_ad.ad.expanded_text_ad.path1,
+    ad_group_ad.ad.expanded_text_ad.path2
+  FROM ad_group_ad
+  WHERE ad_group_ad.ad_group = 'customers/{customer_id}/adGroups/{ad_group_id}'
+    AND ad_group_ad.ad.type = EXPANDED_TEXT_AD
+"""
+
+_Q_AD_GROUP_NAME = """
+  SELECT ad_group.name, campaign.name, ad_group.status
+  FROM ad_group
+  WHERE ad_group.id = {ad_group_id}
+  LIMIT 1
+"""
+
+
 def ga(client):
     return client.get_service("GoogleAdsService")
 
@@ -21,52 +63,93 @@ def qrows(client, customer_id: str, query: str):
     return list(ga(client).search(customer_id=customer_id, query=query))
 
 
+def qiter(client, customer_id: str, query: str):
+    """Rows as the pager yields them (one page in memory at a time)."""
+    return ga(client).search(customer_id=customer_id, query=query)
+
+
+def _fp(h_texts, d_texts, urls, path1, path2):
+    """16-byte digest of an RSA's sorted texts, URLs and paths (order-insensitive)."""
+    h = hashlib.blake2b(digest_size=16)
+    for s in sorted(h_texts):
+        h.update(s.encode())
+        h.update(b"\x00")
+    h.update(b"\x01")
+    for s in sorted(d_texts):
+        h.update(s.encode())
+        h.update(b"\x00")
+    h.update(b"\x01")
+    for u in sorted(urls):
+        h.update(u.encode())
+        h.update(b"\x00")
+    h.update((path1 or "").encode())
+    h.update(b"\x01")
+    h.update((path2 or "").encode())
+    return h.digest()
+
+
 def get_dest_rsa_fingerprints(client, customer_id, ad_group_id):
-    query = f"""
-      SELECT
-        ad_group_ad.ad.responsive_search_ad.headlines,
-        ad_group_ad.ad.responsive_search_ad.descriptions,
-        ad_group_ad.ad.responsive_search_ad.path1,
-        ad_group_ad.ad.responsive_search_ad.path2,
-        ad_group_ad.ad.final_urls
-      FROM ad_group_ad
-      WHERE ad_group_ad.ad_group = 'customers/{customer_id}/adGroups/{ad_group_id}'
-        AND ad_group_ad.ad.type = RESPONSIVE_SEARCH_AD
-    """
+    query = _Q_RSA_FP.format_map({"customer_id": customer_id, "ad_group_id": ad_group_id})
     fps = set()
     for r in qrows(client, customer_id, query):
         ad = r.ad_group_ad.ad
         rsa = ad.responsive_search_ad
         if not rsa:
             continue
-        h = tuple(sorted([a.text.strip() for a in rsa.headlines]))
-        d = tuple(sorted([a.text.strip() for a in rsa.descriptions]))
-        urls = tuple(sorted(ad.final_urls))
-        fps.add((h, d, urls, rsa.path1, rsa.path2))
+        fps.add(_fp(
+            (a.text.strip() for a in rsa.headlines),
+            (a.text.strip() for a in rsa.descriptions),
+            ad.final_urls,
+            rsa.path1,
+            rsa.path2,
+        ))
     return fps
 
 
+# Destination fingerprints reused across reruns for FPS_CACHE_TTL seconds
+FPS_CACHE_DIR = os.path.expanduser("~/.cache/google-ads-rebuild")
+FPS_CACHE_TTL = 600
+
+
+def _fps_cache_path(customer_id, ad_group_id):
+    return os.path.join(FPS_CACHE_DIR, f"fps-{customer_id}-{ad_group_id}.pickle")
+
+
+def load_cached_fps(customer_id, ad_group_id):
+    """Fingerprint set from disk, or None if missing, stale or unreadable."""
+    path = _fps_cache_path(customer_id, ad_group_id)
+    try:
+        if time.time() - os.path.getmtime(path) >= FPS_CACHE_TTL:
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def save_cached_fps(customer_id, ad_group_id, fps):
+    os.makedirs(FPS_CACHE_DIR, exist_ok=True)
+    with open(_fps_cache_path(customer_id, ad_group_id), "wb") as f:
+        pickle.dump(fps, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def drop_cached_fps(customer_id, ad_group_id):
+    try:
+        os.remove(_fps_cache_path(customer_id, ad_group_id))
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+
+
 def get_etas(client, customer_id, source_ad_group_id):
-    query = f"""
-      SELECT
-        ad_group_ad.status,
-        ad_group_ad.ad.final_urls,
-        ad_group_ad.ad.expanded_text_ad.headline_part1,
-        ad_group_ad.ad.expanded_text_ad.headline_part2,
-        ad_group_ad.ad.expanded_text_ad.headline_part3,
-        ad_group_ad.ad.expanded_text_ad.description,
-        ad_group_ad.ad.expanded_text_ad.description2,
-        ad_group_ad.ad.expanded_text_ad.path1,
-        ad_group_ad.ad.expanded_text_ad.path2
-      FROM ad_group_ad
-      WHERE ad_group_ad.ad_group = 'customers/{customer_id}/adGroups/{source_ad_group_id}'
-        AND ad_group_ad.ad.type = EXPANDED_TEXT_AD
-    """
-    return qrows(client, customer_id, query)
+    query = _Q_ETAS.format_map({"customer_id": customer_id, "ad_group_id": source_ad_group_id})
+    return qiter(client, customer_id, query)
 
 
 # ---------- helpers ----------
 
+# Operations per mutate_ad_group_ads request; keeps requests well under API size limits
+MUTATE_CHUNK_SIZE = 3000
+
 FALLBACK_H = [
     "Accredited Online School",
     "Flexible, Self-Paced Program",
@@ -100,7 +183,25 @@ def _unique_append(target_list, text_set, asset):
         text_set.add(t)
 
 
-def ensure_min_assets_with_mode(client, headlines, descriptions, no_pin, pin_fields, pad_mode):
+def _dedupe_by_text(assets):
+    """Map each non-empty stripped text to its first asset, preserving order."""
+    seen = {}
+    for a in assets:
+        t = a.text.strip()
+        if t:
+            seen.setdefault(t, a)
+    return seen
+
+
+def build_fallback_assets(client):
+    """Unpinned AdTextAssets for FALLBACK_H / FALLBACK_D, built once per run."""
+    return (
+        [_text_asset(client, fb, None, no_pin=True) for fb in FALLBACK_H],
+        [_text_asset(client, fb, None, no_pin=True) for fb in FALLBACK_D],
+    )
+
+
+def ensure_min_assets_with_mode(client, headlines, descriptions, no_pin, pin_fields, pad_mode, fallbacks=None):
     """
     Enforce RSA minimums:
       - headlines >= 3
@@ -108,24 +209,27 @@ def ensure_min_assets_with_mode(client, headlines, descriptions, no_pin, pin_fie
     pad_mode:
       - 'skip'    -> do nothing (caller should skip if < mins)
       - 'generic' -> add unique fallback assets until mins are reached
+    fallbacks: optional (headline_assets, description_assets) from build_fallback_assets.
+    They can be shared between ads because repeated-field extend() copies the message.
     """
     if pad_mode != "generic":
         return  # nothing to do; caller will skip if short
 
+    fb_h, fb_d = fallbacks or build_fallback_assets(client)
     existing_h = {h.text.strip() for h in headlines}
     existing_d = {d.text.strip() for d in descriptions}
 
     # Headlines
-    for fb in FALLBACK_H:
+    for fb in fb_h:
         if len(headlines) >= 3:
             break
-        _unique_append(headlines, existing_h, _text_asset(client, fb, None, no_pin=True))
+        _unique_append(headlines, existing_h, fb)
 
     # Descriptions
-    for fb in FALLBACK_D:
+    for fb in fb_d:
         if len(descriptions) >= 2:
             break
-        _unique_append(descriptions, existing_d, _text_asset(client, fb, None, no_pin=True))
+        _unique_append(descriptions, existing_d, fb)
 
 
 def create_rsas_from_etas(
@@ -138,30 +242,57 @@ def create_rsas_from_etas(
     preview=False,
     no_pin=False,
     pad_mode="skip",
+    created_fps=None,
 ):
+    """Create RSAs for eta_rows not already in existing_fps; returns the count.
+
+    If created_fps is a list, fingerprints of RSAs the API accepted are appended to it.
+    """
     svc = client.get_service("AdGroupAdService")
     AdGroupAdStatusEnum = client.enums.AdGroupAdStatusEnum
     PinnedFieldEnum = client.enums.ServedAssetFieldTypeEnum
 
-    pin_fields = {
-        "HEADLINE_1": PinnedFieldEnum.HEADLINE_1,
-        "HEADLINE_2": PinnedFieldEnum.HEADLINE_2,
-        "HEADLINE_3": PinnedFieldEnum.HEADLINE_3,
-        "DESCRIPTION_1": PinnedFieldEnum.DESCRIPTION_1,
-        "DESCRIPTION_2": PinnedFieldEnum.DESCRIPTION_2,
-    }
+    # Pin values resolved once (enum attribute access is not free)
+    H1, H2, H3 = PinnedFieldEnum.HEADLINE_1, PinnedFieldEnum.HEADLINE_2, PinnedFieldEnum.HEADLINE_3
+    D1, D2 = PinnedFieldEnum.DESCRIPTION_1, PinnedFieldEnum.DESCRIPTION_2
 
-    def rsa_fp(heads, descs, urls, path1, path2):
-        h = tuple(sorted([h.text.strip() for h in heads]))
-        d = tuple(sorted([d.text.strip() for d in descs]))
-        u = tuple(sorted(urls))
-        return (h, d, u, path1, path2)
+    def add_asset(target, text, pin):
+        if text:
+            target.append(_text_asset(client, text, pin, no_pin=no_pin))
+
+    # Same for every operation; build once
+    fallbacks = build_fallback_assets(client) if pad_mode == "generic" else None
+    dest_resource = f"customers/{customer_id}/adGroups/{dest_ad_group_id}"
+    create_status = AdGroupAdStatusEnum.PAUSED if pause_on_create else AdGroupAdStatusEnum.ENABLED
 
     ops = []
+    op_fps = []
     would_create = 0
     skipped_short = 0
+    seen_etas = 0
+    created = 0
+
+    # Chunked with partial_failure so one rejected RSA doesn't sink the rest
+    def flush():
+        nonlocal created
+        # partial_failure is not a flattened argument; it has to go on the request
+        req = client.get_type("MutateAdGroupAdsRequest")
+        req.customer_id = customer_id
+        req.operations.extend(ops)
+        req.partial_failure = True
+        resp = svc.mutate_ad_group_ads(request=req)
+        for res, fp in zip(resp.results, op_fps):
+            if res.resource_name:
+                created += 1
+                if created_fps is not None:
+                    created_fps.append(fp)
+        if resp.partial_failure_error:
+            print(f"(warn) partial failure: {resp.partial_failure_error.message}")
+        ops.clear()
+        op_fps.clear()
 
     for r in eta_rows:
+        seen_etas += 1
         ad = r.ad_group_ad.ad
         eta = ad.expanded_text_ad
         if not eta:
@@ -169,25 +300,15 @@ def create_rsas_from_etas(
 
         headlines, descriptions = [], []
 
-        def add_head(text, pin_key=None):
-            if text:
-                pin = pin_fields[pin_key] if pin_key else None
-                headlines.append(_text_asset(client, text, pin, no_pin=no_pin))
-
-        def add_desc(text, pin_key=None):
-            if text:
-                pin = pin_fields[pin_key] if pin_key else None
-                descriptions.append(_text_asset(client, text, pin, no_pin=no_pin))
-
         # Map ETA parts
-        add_head(eta.headline_part1, "HEADLINE_1")
-        add_head(eta.headline_part2, "HEADLINE_2")
-        add_head(getattr(eta, "headline_part3", None), "HEADLINE_3")
-        add_desc(eta.description, "DESCRIPTION_1")
-        add_desc(getattr(eta, "description2", None), "DESCRIPTION_2")
-
-        path1 = getattr(eta, "path1", None)
-        path2 = getattr(eta, "path2", None)
+        add_asset(headlines, eta.headline_part1, H1)
+        add_asset(headlines, eta.headline_part2, H2)
+        add_asset(headlines, eta.headline_part3, H3)
+        add_asset(descriptions, eta.description, D1)
+        add_asset(descriptions, eta.description2, D2)
+
+        path1 = eta.path1
+        path2 = eta.path2
         urls = list(ad.final_urls) if ad.final_urls else []
 
         # Must have at least some content & final URL
@@ -201,31 +322,25 @@ def create_rsas_from_etas(
                 skipped_short += 1
                 continue
             else:
-                ensure_min_assets_with_mode(client, headlines, descriptions, no_pin, pin_fields, pad_mode)
+                ensure_min_assets_with_mode(client, headlines, descriptions, no_pin, None, pad_mode, fallbacks)
 
         # De-dup texts within each ad (avoid duplicate asset error)
-        seen_h, dedup_h = set(), []
-        for h in headlines:
-            t = h.text.strip()
-            if t and t not in seen_h:
-                dedup_h.append(h); seen_h.add(t)
-        headlines = dedup_h
-
-        seen_d, dedup_d = set(), []
-        for d in descriptions:
-            t = d.text.strip()
-            if t and t not in seen_d:
-                dedup_d.append(d); seen_d.add(t)
-        descriptions = dedup_d
+        head_by_text = _dedupe_by_text(headlines)
+        desc_by_text = _dedupe_by_text(descriptions)
+        headlines = list(head_by_text.values())
+        descriptions = list(desc_by_text.values())
 
         # Final guard: must now meet RSA mins
         if len(headlines) < 3 or len(descriptions) < 2:
             skipped_short += 1
             continue
 
-        fp = rsa_fp(headlines, descriptions, urls, path1, path2)
-        if fp in existing_fps:
-            continue
+        # Dict keys are the stripped texts, matching get_dest_rsa_fingerprints.
+        # A preview against a fresh destination has no use for the digest; skip it.
+        if existing_fps or not preview:
+            fp = _fp(head_by_text, desc_by_text, urls, path1, path2)
+            if fp in existing_fps:
+                continue
 
         if preview:
             would_create += 1
@@ -233,8 +348,8 @@ def create_rsas_from_etas(
 
         op = client.get_type("AdGroupAdOperation")
         aga = op.create
-        aga.ad_group = f"customers/{customer_id}/adGroups/{dest_ad_group_id}"
-        aga.status = AdGroupAdStatusEnum.PAUSED if pause_on_create else AdGroupAdStatusEnum.ENABLED
+        aga.ad_group = dest_resource
+        aga.status = create_status
         new_ad = aga.ad
         new_ad.final_urls.extend(urls)
         rsa = new_ad.responsive_search_ad
@@ -243,25 +358,23 @@ def create_rsas_from_etas(
         if path1: rsa.path1 = path1
         if path2: rsa.path2 = path2
         ops.append(op)
+        op_fps.append(fp)
+        if len(ops) >= MUTATE_CHUNK_SIZE:
+            flush()
 
     if preview:
-        print(f"(info) skipped_incomplete={skipped_short} (pad_mode={pad_mode})")
+        print(f"(info) etas={seen_etas} skipped_incomplete={skipped_short} (pad_mode={pad_mode})")
         return would_create
 
     if ops:
-        svc.mutate_ad_group_ads(customer_id=customer_id, operations=ops)
+        flush()
 
-    print(f"(info) skipped_incomplete={skipped_short} (pad_mode={pad_mode})")
-    return len(ops)
+    print(f"(info) etas={seen_etas} skipped_incomplete={skipped_short} (pad_mode={pad_mode})")
+    return created
 
 
 def resolve_name(client, customer_id, ad_group_id):
-    q = f"""
-      SELECT ad_group.name, campaign.name, ad_group.status
-      FROM ad_group
-      WHERE ad_group.id = {ad_group_id}
-      LIMIT 1
-    """
+    q = _Q_AD_GROUP_NAME.format_map({"ad_group_id": ad_group_id})
     rows = qrows(client, customer_id, q)
     if not rows:
         return (f"ad_group:{ad_group_id}", "campaign:?", "UNKNOWN")
@@ -279,20 +392,38 @@ def main():
     ap.add_argument("--no-pin", action="store_true", help="Do not pin assets; create normal RSAs.")
     ap.add_argument("--pad-mode", choices=["skip", "generic"], default="skip",
                     help="How to reach RSA minimums if ETA lacks assets (default: skip).")
+    ap.add_argument("--refresh-fps", action="store_true",
+                    help="Ignore cached destination fingerprints and re-query them.")
     args = ap.parse_args()
 
     client = GoogleAdsClient.load_from_storage()
 
-    sname, scamp, sstatus = resolve_name(client, args.customer_id, args.source_ad_group_id)
-    dname, dcamp, dstatus = resolve_name(client, args.customer_id, args.dest_ad_group_id)
+    existing = None if args.refresh_fps else load_cached_fps(args.customer_id, args.dest_ad_group_id)
+
+    def cache_fps(fps):
+        try:
+            save_cached_fps(args.customer_id, args.dest_ad_group_id, fps)
+        except OSError as e:
+            print(f"(note) Could not write fingerprint cache in {FPS_CACHE_DIR}: {e}")
+
+    # The lookups are independent read-only searches; run them concurrently
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        f_src = ex.submit(resolve_name, client, args.customer_id, args.source_ad_group_id)
+        f_dst = ex.submit(resolve_name, client, args.customer_id, args.dest_ad_group_id)
+        f_etas = ex.submit(get_etas, client, args.customer_id, args.source_ad_group_id)
+        f_fps = None
+        if existing is None:
+            f_fps = ex.submit(get_dest_rsa_fingerprints, client, args.customer_id, args.dest_ad_group_id)
+        sname, scamp, sstatus = f_src.result()
+        dname, dcamp, dstatus = f_dst.result()
+        etas = f_etas.result()
+        if f_fps is not None:
+            existing = f_fps.result()
+            cache_fps(existing)
+
     print(f"Source ad group: {sname} (status={sstatus}) in campaign '{scamp}'")
     print(f"Destination ad group: {dname} (status={dstatus}) in campaign '{dcamp}'")
 
-    etas = get_etas(client, args.customer_id, args.source_ad_group_id)
-    print(f"Found {len(etas)} ETAs in source.")
-
-    existing = get_dest_rsa_fingerprints(client, args.customer_id, args.dest_ad_group_id)
-
     if args.dry_run:
         would = create_rsas_from_etas(
             client, args.customer_id, args.dest_ad_group_id,
@@ -302,11 +433,22 @@ def main():
         print(f"DRY RUN: would create {would} RSAs from ETAs.")
         return
 
+    # A failed mutate can leave some chunks created; drop the cache first so a
+    # rerun re-queries the destination instead of trusting pre-run fingerprints
+    try:
+        drop_cached_fps(args.customer_id, args.dest_ad_group_id)
+    except OSError as e:
+        print(f"(note) Could not remove fingerprint cache in {FPS_CACHE_DIR}: {e}")
+
+    new_fps = []
     created = create_rsas_from_etas(
         client, args.customer_id, args.dest_ad_group_id,
         etas, existing, pause_on_create=args.pause_on_create,
-        preview=False, no_pin=args.no_pin, pad_mode=args.pad_mode
+        preview=False, no_pin=args.no_pin, pad_mode=args.pad_mode,
+        created_fps=new_fps,
     )
+    # Completed without raising: pre-run fingerprints plus what we just added
+    cache_fps(existing.union(new_fps))
     print(f"Created {created} RSAs from ETAs in destination.")
 
 
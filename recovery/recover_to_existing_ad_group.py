@@ -25,113 +25,196 @@ python recover_to_existing_ad_group.py \
 """
 
 import argparse
+import functools
+import hashlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from google.ads.googleads.client import GoogleAdsClient
 
 
+@functools.lru_cache(maxsize=None)
 def ga(client):
     return client.get_service("GoogleAdsService")
 
 
+@functools.lru_cache(maxsize=None)
+def msg_class(client, name):
+    """Message class for a type name; instances are built by calling it."""
+    return type(client.get_type(name))
+
+
 def qrows(client, customer_id: str, query: str):
-    return list(ga(client).search(customer_id=customer_id, query=query))
+    """Yield rows as search_stream batches arrive; callers that need a list materialize it."""
+    for batch in ga(client).search_stream(customer_id=customer_id, query=query):
+        yield from batch.results
+
+
+# GAQL templates; filled per call with str.format_map.
+_Q_AD_GROUPS = """
+  SELECT
+    ad_group.id,
+    ad_group.name,
+    ad_group.status,
+    ad_group.campaign,
+    campaign.id,
+    campaign.name
+  FROM ad_group
+  WHERE ad_group.id IN ({ad_group_ids})
+"""
 
+_Q_KEYWORDS = """
+  SELECT
+    ad_group_criterion.negative,
+    ad_group_criterion.keyword.text,
+    ad_group_criterion.keyword.match_type
+  FROM ad_group_criterion
+  WHERE ad_group_criterion.ad_group = 'customers/{customer_id}/adGroups/{ad_group_id}'
+    AND ad_group_criterion.type = KEYWORD
+"""
+
+_Q_RSAS = """
+  SELECT
+    ad_group_ad.ad.final_urls,
+    ad_group_ad.ad.responsive_search_ad.headlines,
+    ad_group_ad.ad.responsive_search_ad.descriptions,
+    ad_group_ad.ad.responsive_search_ad.path1,
+    ad_group_ad.ad.responsive_search_ad.path2
+  FROM ad_group_ad
+  WHERE ad_group_ad.ad_group = 'customers/{customer_id}/adGroups/{ad_group_id}'
+    AND ad_group_ad.ad.type = RESPONSIVE_SEARCH_AD
+"""
 
-def get_removed_ad_group(client, customer_id, ad_group_id):
-    query = f"""
-      SELECT
-        ad_group.id, ad_group.name, ad_group.status, ad_group.campaign
-      FROM ad_group
-      WHERE ad_group.id = {ad_group_id}
-      LIMIT 1
-    """
-    rows = qrows(client, customer_id, query)
-    return rows[0] if rows else None
+
+def get_ad_groups(client, customer_id, *ad_group_ids):
+    """Rows for the given ad groups (REMOVED included), keyed by ad group ID string."""
+    query = _Q_AD_GROUPS.format_map({"ad_group_ids": ", ".join(ad_group_ids)})
+    return {str(r.ad_group.id): r for r in qrows(client, customer_id, query)}
 
 
 def get_keywords_for_ad_group(client, customer_id, ad_group_id):
-    query = f"""
-      SELECT
-        ad_group_criterion.criterion_id,
-        ad_group_criterion.status,
-        ad_group_criterion.negative,
-        ad_group_criterion.keyword.text,
-        ad_group_criterion.keyword.match_type
-      FROM ad_group_criterion
-      WHERE ad_group_criterion.ad_group = 'customers/{customer_id}/adGroups/{ad_group_id}'
-        AND ad_group_criterion.type = KEYWORD
-    """
+    query = _Q_KEYWORDS.format_map({"customer_id": customer_id, "ad_group_id": ad_group_id})
     return qrows(client, customer_id, query)
 
 
 def get_rsas_for_ad_group(client, customer_id, ad_group_id):
-    query = f"""
-      SELECT
-        ad_group_ad.ad.id,
-        ad_group_ad.status,
-        ad_group_ad.ad.final_urls,
-        ad_group_ad.ad.responsive_search_ad.headlines,
-        ad_group_ad.ad.responsive_search_ad.descriptions,
-        ad_group_ad.ad.responsive_search_ad.path1,
-        ad_group_ad.ad.responsive_search_ad.path2
-      FROM ad_group_ad
-      WHERE ad_group_ad.ad_group = 'customers/{customer_id}/adGroups/{ad_group_id}'
-        AND ad_group_ad.ad.type = RESPONSIVE_SEARCH_AD
-    """
+    query = _Q_RSAS.format_map({"customer_id": customer_id, "ad_group_id": ad_group_id})
     return qrows(client, customer_id, query)
 
 
-def get_existing_keyword_set(client, customer_id, dest_ad_group_id):
-    rows = get_keywords_for_ad_group(client, customer_id, dest_ad_group_id)
-    exists = set()
+def _fp(ad):
+    """
+    64-bit int fingerprint of an RSA: sorted stripped texts, sorted URLs, paths.
+    Only comparable with other _fp values from this script; rebuild_etas_as_rsas._fp
+    is a 16-byte bytes digest over its own inputs, so the two are not interchangeable.
+    """
+    rsa = ad.responsive_search_ad
+    h = hashlib.blake2b(digest_size=8)
+    for s in sorted(a.text.strip() for a in rsa.headlines):
+        h.update(s.encode())
+        h.update(b"\x00")
+    h.update(b"\x01")
+    for s in sorted(a.text.strip() for a in rsa.descriptions):
+        h.update(s.encode())
+        h.update(b"\x00")
+    h.update(b"\x01")
+    for u in sorted(ad.final_urls):
+        h.update(u.encode())
+        h.update(b"\x00")
+    h.update(rsa.path1.encode())
+    h.update(b"\x01")
+    h.update(rsa.path2.encode())
+    return int.from_bytes(h.digest(), "big")
+
+
+def _rsa_fp(row):
+    """Fingerprint of an ad_group_ad row, or None if it has no RSA."""
+    ad = row.ad_group_ad.ad
+    return _fp(ad) if ad.responsive_search_ad else None
+
+
+# Keyword sets map lowercased text -> bitmask of (match type, negative) pairs seen.
+# A miss is one dict probe on a str whose hash is cached, so a Bloom filter in
+# front of it would add a hash per lookup rather than save one.
+MT_INDEX = {name: i for i, name in enumerate(("UNSPECIFIED", "UNKNOWN", "EXACT", "PHRASE", "BROAD"))}
+
+
+def _kw_bit(mt_name, negative):
+    return 1 << (MT_INDEX[mt_name] * 2 + int(negative))
+
+
+def get_existing_keyword_set(rows):
+    exists = {}
     for r in rows:
         c = r.ad_group_criterion
-        text = c.keyword.text.strip().lower()
-        mt = c.keyword.match_type.name
-        neg = bool(c.negative)
-        exists.add((text, mt, neg))
+        text = sys.intern(c.keyword.text.strip().lower())
+        exists[text] = exists.get(text, 0) | _kw_bit(c.keyword.match_type.name, bool(c.negative))
     return exists
 
 
-def get_existing_rsa_fingerprints(client, customer_id, dest_ad_group_id):
-    rows = get_rsas_for_ad_group(client, customer_id, dest_ad_group_id)
-    fps = set()
-    for r in rows:
-        ad = r.ad_group_ad.ad
-        rsa = ad.responsive_search_ad
-        if not rsa:
-            continue
-        h = tuple(sorted([a.text.strip() for a in rsa.headlines]))
-        d = tuple(sorted([a.text.strip() for a in rsa.descriptions]))
-        urls = tuple(sorted(ad.final_urls))
-        path1 = rsa.path1
-        path2 = rsa.path2
-        fps.add((h, d, urls, path1, path2))
-    return fps
+def count_keywords(kw_set):
+    """Number of (text, match type, negative) entries in a keyword set."""
+    return sum(bin(mask).count("1") for mask in kw_set.values())
 
 
-def create_keywords(client, customer_id, dest_ag_res, source_kw_rows,
-                    existing_set, only_exact=False, pause_on_create=False,
-                    dedupe=True, copy_negatives=False):
-    svc = client.get_service("AdGroupCriterionService")
-    ops = []
+def get_existing_rsa_fingerprints(rows):
+    fps = set(map(_rsa_fp, rows))
+    fps.discard(None)
+    return fps
 
-    for r in source_kw_rows:
+
+def normalize_keywords(rows):
+    """Plain (text, text_lower, match_type, match_type_name, negative) tuples, read once per row."""
+    out = []
+    for r in rows:
         c = r.ad_group_criterion
         text = c.keyword.text.strip()
-        mt_enum = c.keyword.match_type if not only_exact else client.enums.KeywordMatchTypeEnum.EXACT
-        mt_name = mt_enum.name
-        is_negative = bool(c.negative)
+        mt = c.keyword.match_type
+        # Interned like the destination keys: one copy per text across match types,
+        # and dict probes against those keys match on identity
+        out.append((text, sys.intern(text.lower()), mt, mt.name, bool(c.negative)))
+    return out
+
+
+def iter_new_kws(source_kws, existing_set, exact=None, copy_negatives=False, dedupe=True):
+    """Yield (text, match_type, negative) for source keywords worth creating.
 
+    `exact` is the EXACT enum value to force on every keyword, or None to keep
+    source match types. With dedupe, skips keywords already in the destination
+    and repeats within this run (e.g. Broad+Phrase of one text both forced to Exact).
+    """
+    seen = dict(existing_set) if dedupe else None
+    for text, text_lower, mt_enum, mt_name, is_negative in source_kws:
         # Skip negatives unless the flag is set
         if is_negative and not copy_negatives:
             continue
 
-        key = (text.lower(), mt_name, is_negative)
-        if dedupe and key in existing_set:
-            continue
+        if exact is not None:
+            mt_enum, mt_name = exact, "EXACT"
+        if seen is not None:
+            bit = _kw_bit(mt_name, is_negative)
+            mask = seen.get(text_lower, 0)
+            if mask & bit:
+                continue
+            seen[text_lower] = mask | bit
 
-        op = client.get_type("AdGroupCriterionOperation")
-        kw = op.create
+        yield text, mt_enum, is_negative
+
+
+def build_keyword_ops(client, dest_ag_res, source_kws,
+                      existing_set, only_exact=False, pause_on_create=False,
+                      dedupe=True, copy_negatives=False):
+    # Resolved once; enum lookups are not free inside the loop
+    MutateOperation = msg_class(client, "MutateOperation")
+    exact = client.enums.KeywordMatchTypeEnum.EXACT if only_exact else None
+    CriterionStatusEnum = client.enums.AdGroupCriterionStatusEnum
+    positive_status = CriterionStatusEnum.PAUSED if pause_on_create else CriterionStatusEnum.ENABLED
+    ops = []
+
+    new_kws = iter_new_kws(source_kws, existing_set, exact=exact,
+                           copy_negatives=copy_negatives, dedupe=dedupe)
+    for text, mt_enum, is_negative in new_kws:
+        op = MutateOperation()
+        kw = op.ad_group_criterion_operation.create
         kw.ad_group = dest_ag_res
         kw.keyword.text = text
         kw.keyword.match_type = mt_enum
@@ -139,57 +222,90 @@ def create_keywords(client, customer_id, dest_ag_res, source_kw_rows,
 
         if not is_negative:
             # Positives can be enabled/paused
-            kw.status = (client.enums.AdGroupCriterionStatusEnum.PAUSED
-                         if pause_on_create else client.enums.AdGroupCriterionStatusEnum.ENABLED)
+            kw.status = positive_status
         # Negatives have no enabled/paused state; just create them.
 
         ops.append(op)
 
-    if ops:
-        svc.mutate_ad_group_criteria(customer_id=customer_id, operations=ops)
-    return len(ops)
+    return ops
 
 
-def create_rsas(client, customer_id, dest_ag_res, source_ad_rows,
-                existing_fps, pause_on_create=False, dedupe=True):
-    svc = client.get_service("AdGroupAdService")
+def build_rsa_ops(client, dest_ag_res, source_ad_rows,
+                  existing_fps, pause_on_create=False, dedupe=True, src_fps=None):
+    """MutateOperations copying source RSAs; src_fps, if given, are _rsa_fp of each row."""
+    MutateOperation = msg_class(client, "MutateOperation")
+    AdTextAsset = msg_class(client, "AdTextAsset")
     AdGroupAdStatusEnum = client.enums.AdGroupAdStatusEnum
+    create_status = AdGroupAdStatusEnum.PAUSED if pause_on_create else AdGroupAdStatusEnum.ENABLED
     ops = []
-    for r in source_ad_rows:
+    if src_fps is None:
+        src_fps = map(_rsa_fp, source_ad_rows)
+    for r, fp in zip(source_ad_rows, src_fps):
+        if fp is None:  # not an RSA
+            continue
+        if dedupe and fp in existing_fps:
+            continue
         ad = r.ad_group_ad.ad
         rsa = ad.responsive_search_ad
-        if not rsa:
-            continue
-        h = tuple(sorted([a.text.strip() for a in rsa.headlines]))
-        d = tuple(sorted([a.text.strip() for a in rsa.descriptions]))
-        urls = tuple(sorted(ad.final_urls))
         path1 = rsa.path1
         path2 = rsa.path2
-        fp = (h, d, urls, path1, path2)
-        if dedupe and fp in existing_fps:
-            continue
 
-        op = client.get_type("AdGroupAdOperation")
-        aga = op.create
+        op = MutateOperation()
+        aga = op.ad_group_ad_operation.create
         aga.ad_group = dest_ag_res
-        aga.status = (AdGroupAdStatusEnum.PAUSED
-                      if pause_on_create else AdGroupAdStatusEnum.ENABLED)
+        aga.status = create_status
         new_ad = aga.ad
         new_ad.final_urls.extend(ad.final_urls)
         new_rsa = new_ad.responsive_search_ad
-        for hh in rsa.headlines:
-            asset = client.get_type("AdTextAsset"); asset.text = hh.text
-            new_rsa.headlines.append(asset)
-        for dd in rsa.descriptions:
-            asset = client.get_type("AdTextAsset"); asset.text = dd.text
-            new_rsa.descriptions.append(asset)
+        # Text only: source assets also carry pins and read-only fields
+        # (performance label, policy info) that must not be copied over
+        new_rsa.headlines.extend([AdTextAsset(text=hh.text) for hh in rsa.headlines])
+        new_rsa.descriptions.extend([AdTextAsset(text=dd.text) for dd in rsa.descriptions])
         if path1: new_rsa.path1 = path1
         if path2: new_rsa.path2 = path2
         ops.append(op)
 
-    if ops:
-        svc.mutate_ad_group_ads(customer_id=customer_id, operations=ops)
-    return len(ops)
+    return ops
+
+
+# Operations per GoogleAdsService.mutate request; stays well under the API's per-request limit
+MUTATE_CHUNK_SIZE = 2000
+
+
+def apply_operations(client, customer_id, ops, concurrency=1):
+    """Send keyword and RSA creates through GoogleAdsService.mutate in chunks.
+
+    Chunks are independent, so up to `concurrency` of them are in flight at once.
+    Returns (keywords_created, rsas_created); with partial_failure, rejected
+    operations come back as empty responses and are not counted.
+    """
+    svc = ga(client)
+
+    def send(chunk):
+        # partial_failure is not a flattened argument; it has to go on the request
+        req = client.get_type("MutateGoogleAdsRequest")
+        req.customer_id = customer_id
+        req.mutate_operations.extend(chunk)
+        req.partial_failure = True
+        resp = svc.mutate(request=req)
+        kw = ads = 0
+        for res in resp.mutate_operation_responses:
+            if res.ad_group_criterion_result.resource_name:
+                kw += 1
+            elif res.ad_group_ad_result.resource_name:
+                ads += 1
+        return kw, ads, resp.partial_failure_error
+
+    chunks = [ops[i:i + MUTATE_CHUNK_SIZE] for i in range(0, len(ops), MUTATE_CHUNK_SIZE)]
+    added_kw = added_ads = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as ex:
+        # map keeps chunk order, so warnings print in a stable order
+        for kw, ads, err in ex.map(send, chunks):
+            added_kw += kw
+            added_ads += ads
+            if err:
+                print(f"(warn) partial failure: {err.message}")
+    return added_kw, added_ads
 
 
 def main():
@@ -203,12 +319,15 @@ def main():
     ap.add_argument("--only-exact", action="store_true")
     ap.add_argument("--copy-negatives", action="store_true",
                     help="Also copy negative keywords from source to destination")
+    ap.add_argument("--concurrency", type=int, default=1,
+                    help="Mutate chunks to send in parallel (default: 1)")
     args = ap.parse_args()
 
     client = GoogleAdsClient.load_from_storage()
 
-    # --- Source (removed) ad group summary
-    src = get_removed_ad_group(client, args.customer_id, args.source_ad_group_id)
+    # --- Source (removed) and destination ad groups in one round trip
+    groups = get_ad_groups(client, args.customer_id, args.source_ad_group_id, args.dest_ad_group_id)
+    src = groups.get(args.source_ad_group_id)
     if not src:
         raise SystemExit("Source ad group not found. Tip: ID must be correct; status may be REMOVED.")
     print(f"Source ad group: {src.ad_group.name} (status={src.ad_group.status.name})")
@@ -216,20 +335,8 @@ def main():
     dest_ag_res = f"customers/{args.customer_id}/adGroups/{args.dest_ad_group_id}"
 
     # --- Destination ad group name & campaign for human-friendly confirmation
-    q = f"""
-      SELECT
-        ad_group.id,
-        ad_group.name,
-        ad_group.status,
-        campaign.id,
-        campaign.name
-      FROM ad_group
-      WHERE ad_group.id = {args.dest_ad_group_id}
-      LIMIT 1
-    """
-    rows = qrows(client, args.customer_id, q)
-    if rows:
-        r = rows[0]
+    r = groups.get(args.dest_ad_group_id)
+    if r:
         dest_name = r.ad_group.name
         dest_status = r.ad_group.status.name
         campaign_name = r.campaign.name
@@ -237,46 +344,42 @@ def main():
     else:
         print(f"Destination ad group: {dest_ag_res}")
 
-    # --- Load assets
-    src_keywords = get_keywords_for_ad_group(client, args.customer_id, args.source_ad_group_id)
-    src_ads = get_rsas_for_ad_group(client, args.customer_id, args.source_ad_group_id)
-    print(f"Found {len(src_keywords)} keywords and {len(src_ads)} RSAs in source.")
-
-    existing_kw = get_existing_keyword_set(client, args.customer_id, args.dest_ad_group_id)
-    existing_ads = get_existing_rsa_fingerprints(client, args.customer_id, args.dest_ad_group_id)
-    print(f"Destination currently has {len(existing_kw)} keywords and {len(existing_ads)} RSAs.")
+    # --- Load assets; the four searches are independent, so run them concurrently.
+    # Rows stream, so each worker also reduces them to what main needs.
+    cid, src_id, dest_id = args.customer_id, args.source_ad_group_id, args.dest_ad_group_id
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        f_src_kw = ex.submit(lambda: normalize_keywords(get_keywords_for_ad_group(client, cid, src_id)))
+        f_src_ads = ex.submit(lambda: list(get_rsas_for_ad_group(client, cid, src_id)))
+        # Destination contents only matter for dedupe
+        if not args.no_dedupe:
+            f_dst_kw = ex.submit(lambda: get_existing_keyword_set(get_keywords_for_ad_group(client, cid, dest_id)))
+            f_dst_ads = ex.submit(lambda: get_existing_rsa_fingerprints(get_rsas_for_ad_group(client, cid, dest_id)))
+        src_kws = f_src_kw.result()
+        src_ads = f_src_ads.result()
+        if args.no_dedupe:
+            existing_kw, existing_ads = {}, set()
+        else:
+            existing_kw = f_dst_kw.result()
+            existing_ads = f_dst_ads.result()
+    print(f"Found {len(src_kws)} keywords and {len(src_ads)} RSAs in source.")
+    # Fingerprinted once; the preview and the mutate path both use these
+    src_fps = [_rsa_fp(r) for r in src_ads]
+    if args.no_dedupe:
+        print("Destination not checked (--no-dedupe).")
+    else:
+        print(f"Destination currently has {count_keywords(existing_kw)} keywords and {len(existing_ads)} RSAs.")
 
     # --- Dry-run preview with breakdown
     if args.dry_run:
-        total = len(src_keywords)
-        negatives = 0
-        dup_vs_dest = 0
-        to_create = 0
-        seen_normalized = set()  # avoid dup creates when forcing EXACT or mixing positives/negatives
-
-        for r in src_keywords:
-            c = r.ad_group_criterion
-            text = c.keyword.text.strip().lower()
-            mt_name = "EXACT" if args.only_exact else c.keyword.match_type.name
-            is_negative = bool(c.negative)
-
-            if is_negative and not args.copy_negatives:
-                negatives += 1
-                continue
-
-            key_dest = (text, mt_name, is_negative)
-
-            if key_dest in existing_kw:
-                dup_vs_dest += 1
-                continue
-
-            # prevent duplicates within this run (e.g., same text in Broad+Phrase → both Exact)
-            if key_dest in seen_normalized:
-                dup_vs_dest += 1
-                continue
-
-            seen_normalized.add(key_dest)
-            to_create += 1
+        total = len(src_kws)
+        negatives = 0 if args.copy_negatives else sum(1 for k in src_kws if k[4])
+        # Same filter the real run uses, so the preview can't drift from it
+        to_create = sum(1 for _ in iter_new_kws(
+            src_kws, existing_kw,
+            exact=client.enums.KeywordMatchTypeEnum.EXACT if args.only_exact else None,
+            copy_negatives=args.copy_negatives, dedupe=(not args.no_dedupe),
+        ))
+        dup_vs_dest = total - negatives - to_create
 
         print("DRY RUN SUMMARY:")
         print(f"  Total source keywords: {total}")
@@ -285,33 +388,23 @@ def main():
         print(f"  Duplicates skipped vs destination/normalized: {dup_vs_dest}")
         print(f"  Would create: {to_create} keywords")
         # RSAs
-        would_create_ads = 0
-        for r in src_ads:
-            ad = r.ad_group_ad.ad
-            rsa = ad.responsive_search_ad
-            if not rsa:
-                continue
-            h = tuple(sorted([a.text.strip() for a in rsa.headlines]))
-            d = tuple(sorted([a.text.strip() for a in rsa.descriptions]))
-            urls = tuple(sorted(ad.final_urls))
-            path1 = rsa.path1
-            path2 = rsa.path2
-            fp = (h, d, urls, path1, path2)
-            if fp not in existing_ads:
-                would_create_ads += 1
+        would_create_ads = sum(
+            1 for fp in src_fps if fp is not None and fp not in existing_ads
+        )
         print(f"  Would create RSAs: {would_create_ads}")
         return
 
-    # --- Mutations
-    added_kw = create_keywords(
-        client, args.customer_id, dest_ag_res, src_keywords, existing_kw,
+    # --- Mutations (keywords and RSAs go out in a single request)
+    ops = build_keyword_ops(
+        client, dest_ag_res, src_kws, existing_kw,
         only_exact=args.only_exact, pause_on_create=args.pause_on_create,
         dedupe=(not args.no_dedupe), copy_negatives=args.copy_negatives
     )
-    added_ads = create_rsas(
-        client, args.customer_id, dest_ag_res, src_ads, existing_ads,
-        pause_on_create=args.pause_on_create, dedupe=(not args.no_dedupe)
+    ops += build_rsa_ops(
+        client, dest_ag_res, src_ads, existing_ads,
+        pause_on_create=args.pause_on_create, dedupe=(not args.no_dedupe), src_fps=src_fps
     )
+    added_kw, added_ads = apply_operations(client, args.customer_id, ops, concurrency=args.concurrency)
     print(f"Created {added_kw} keywords and {added_ads} RSAs in destination.")
 
 